@@ -0,0 +1,34 @@
+"""
+Config Utilities Module
+Shared, cached loading of YAML configuration files.
+"""
+
+import copy
+import os
+from functools import lru_cache
+from typing import Dict, Any
+import yaml
+
+# Prefer the libyaml C loader when PyYAML was built with it
+try:
+    _YamlLoader = yaml.CSafeLoader
+except AttributeError:
+    _YamlLoader = yaml.SafeLoader
+
+
+@lru_cache(maxsize=32)
+def _load_yaml_cached(path: str, mtime: float) -> Dict[str, Any]:
+    """Parse a YAML file; `mtime` is part of the cache key so edits invalidate it."""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
+
+def load_yaml(config_path: str) -> Dict[str, Any]:
+    """
+    Load a YAML file, reusing the parsed result until the file changes.
+    
+    Returns:
+        A copy of the parsed dict, safe for callers to modify
+    """
+    path = os.path.abspath(config_path)
+    return copy.deepcopy(_load_yaml_cached(path, os.path.getmtime(path)))
@@ -3,15 +3,43 @@ Evaluator Module
 Provides metrics and scoring functions for prompt evaluation.
 """
 
-from typing import Dict, Any, List
-import yaml
+import re
+import warnings
+from typing import Dict, Any, List, Set, Tuple, FrozenSet
+
+try:
+    from .config_utils import load_yaml
+except ImportError:
+    # Running the module directly as a script (python src/<module>.py)
+    from config_utils import load_yaml
+
+# Optional: single-pass multi-phrase matching
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Marks the start of each answer in a batched response, e.g. "[#2] ...", also when
+# the model wraps it in markdown such as "**[#2]**:" or "### [#2]"
+_BATCH_MARKER_RE = re.compile(r'^[ \t>#*_]*\[#(\d+)\][*_]*:?[ \t]*', re.MULTILINE)
+
+# Specific percentages and dollar figures, a potential hallucination signal
+_STATS_RE = re.compile(r'\b\d{2,}\s*%\b|\b\$\d+(?:,\d+)*(?:\.\d+)?\s*(?:million|billion)?\b')
+
+# Overconfidence indicators
+OVERCONFIDENCE_PHRASES = [
+    "definitely", "certainly", "absolutely", "without a doubt",
+    "always", "never", "guaranteed"
+]
+
+# Hedging language expected around uncertain claims
+HEDGING_PHRASES = ["may", "might", "could", "typically", "often", "generally", "depending on"]
 
 
 def load_evaluation_config(config_path: str = "config/experiment_config.yaml") -> Dict[str, Any]:
     """Load evaluation criteria from config."""
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
-    return config.get('evaluation', {})
+    return load_yaml(config_path).get('evaluation', {})
 
 
 class ResponseEvaluator:
@@ -22,26 +50,103 @@ class ResponseEvaluator:
         eval_config = load_evaluation_config(config_path)
         self.accuracy_criteria = eval_config.get('accuracy_criteria', [])
         self.completeness_checklist = eval_config.get('completeness_checklist', [])
+        
+        # Criteria are constant, so lowercase and split them once up front
+        self._accuracy_keywords = self._build_keywords(self.accuracy_criteria)
+        self._completeness_keywords = self._build_keywords(self.completeness_checklist)
+        self._phrase_automaton = self._build_phrase_automaton() if AHOCORASICK_AVAILABLE else None
+    
+    @staticmethod
+    def _build_phrase_automaton():
+        """Build an Aho-Corasick automaton labelling each phrase by category."""
+        automaton = ahocorasick.Automaton()
+        for phrase in OVERCONFIDENCE_PHRASES:
+            automaton.add_word(phrase, 'overconfidence')
+        for phrase in HEDGING_PHRASES:
+            automaton.add_word(phrase, 'hedging')
+        automaton.make_automaton()
+        return automaton
+    
+    def _find_phrase_categories(self, response_lower: str) -> Set[str]:
+        """Return the phrase categories ('overconfidence', 'hedging') present in the response."""
+        if self._phrase_automaton is None:
+            found = set()
+            if any(phrase in response_lower for phrase in OVERCONFIDENCE_PHRASES):
+                found.add('overconfidence')
+            if any(phrase in response_lower for phrase in HEDGING_PHRASES):
+                found.add('hedging')
+            return found
+        
+        found = set()
+        for _, category in self._phrase_automaton.iter(response_lower):
+            found.add(category)
+            if len(found) == 2:
+                break
+        return found
+    
+    @staticmethod
+    def _build_keywords(criteria: List[str]) -> List[Tuple[str, FrozenSet[str]]]:
+        """Pair each criterion with the frozenset of its lowercased keywords."""
+        return [(c, frozenset(c.lower().split())) for c in criteria]
+    
+    @staticmethod
+    def _precompute(response: str) -> Dict[str, Any]:
+        """Lowercase and tokenize a response once for reuse across evaluators."""
+        response_lower = response.lower()
+        words = response_lower.split()
+        return {
+            'lower': response_lower,
+            'tokens': set(words),
+            'word_count': len(words)
+        }
     
-    def evaluate_accuracy(self, response: str) -> Dict[str, Any]:
+    def _scan(self, response: str) -> Dict[str, Any]:
         """
-        Evaluate accuracy based on presence of key concepts.
+        Collect every signal used by `full_evaluation` from a single view of the response.
         
-        Returns:
-            Dict with 'score' (0-2), 'matched_criteria', 'missing_criteria'
+        The response is lowercased and tokenized once; keyword matching, phrase
+        detection and the stats regex all run against that shared view.
+        """
+        scan = self._precompute(response)
+        response_lower, tokens = scan['lower'], scan['tokens']
+        scan['accuracy_matches'] = self._match_keywords(self._accuracy_keywords, response_lower, tokens)
+        scan['completeness_matches'] = self._match_keywords(self._completeness_keywords, response_lower, tokens)
+        scan['phrase_categories'] = self._find_phrase_categories(response_lower)
+        scan['stats_count'] = len(_STATS_RE.findall(response))
+        return scan
+    
+    @staticmethod
+    def _match_keywords(keyword_sets: List[Tuple[str, FrozenSet[str]]], response_lower: str,
+                        tokens: Set[str]) -> Tuple[List[str], List[str]]:
+        """
+        Split criteria into (matched, missing) by keyword presence in the response.
+        
+        An exact token hit is checked first via set intersection; only criteria
+        without one fall back to the substring scan, so results are unchanged.
         """
-        response_lower = response.lower()
         matched = []
         missing = []
-        
-        for criterion in self.accuracy_criteria:
-            # Simple keyword matching (can be enhanced with embeddings)
-            keywords = criterion.lower().split()
-            if any(kw in response_lower for kw in keywords):
+        for criterion, keywords in keyword_sets:
+            if keywords & tokens or any(kw in response_lower for kw in keywords):
                 matched.append(criterion)
             else:
                 missing.append(criterion)
+        return matched, missing
+    
+    def evaluate_accuracy(self, response: str, _precomputed: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Evaluate accuracy based on presence of key concepts.
         
+        Returns:
+            Dict with 'score' (0-2), 'matched_criteria', 'missing_criteria'
+        """
+        pre = _precomputed or self._precompute(response)
+        # Simple keyword matching (can be enhanced with embeddings)
+        matched, missing = self._match_keywords(self._accuracy_keywords, pre['lower'], pre['tokens'])
+        return self._score_accuracy(matched, missing)
+    
+    def _score_accuracy(self, matched: List[str], missing: List[str]) -> Dict[str, Any]:
+        """Build the accuracy result from matched and missing criteria."""
         # Score: 0 (wrong), 1 (partial), 2 (fully correct)
         ratio = len(matched) / len(self.accuracy_criteria) if self.accuracy_criteria else 0
         if ratio >= 0.8:
@@ -58,24 +163,19 @@ class ResponseEvaluator:
             'missing_criteria': missing
         }
     
-    def evaluate_completeness(self, response: str) -> Dict[str, Any]:
+    def evaluate_completeness(self, response: str, _precomputed: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Evaluate completeness based on checklist coverage.
         
         Returns:
             Dict with 'percentage', 'covered_items', 'missing_items'
         """
-        response_lower = response.lower()
-        covered = []
-        missing = []
-        
-        for item in self.completeness_checklist:
-            keywords = item.lower().split()
-            if any(kw in response_lower for kw in keywords):
-                covered.append(item)
-            else:
-                missing.append(item)
-        
+        pre = _precomputed or self._precompute(response)
+        covered, missing = self._match_keywords(self._completeness_keywords, pre['lower'], pre['tokens'])
+        return self._score_completeness(covered, missing)
+    
+    def _score_completeness(self, covered: List[str], missing: List[str]) -> Dict[str, Any]:
+        """Build the completeness result from covered and missing checklist items."""
         percentage = (len(covered) / len(self.completeness_checklist) * 100) if self.completeness_checklist else 0
         
         return {
@@ -84,14 +184,15 @@ class ResponseEvaluator:
             'missing_items': missing
         }
     
-    def evaluate_token_efficiency(self, response: str, token_count: int) -> Dict[str, Any]:
+    def evaluate_token_efficiency(self, response: str, token_count: int,
+                                  _precomputed: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Evaluate token efficiency.
         
         Returns:
             Dict with 'token_count', 'words_per_token', 'efficiency_rating'
         """
-        word_count = len(response.split())
+        word_count = _precomputed['word_count'] if _precomputed else len(response.split())
         words_per_token = word_count / token_count if token_count > 0 else 0
         
         # Rating based on conciseness (lower token count for same info = better)
@@ -109,22 +210,27 @@ class ResponseEvaluator:
             'efficiency_rating': rating
         }
     
-    def detect_failure_behaviors(self, response: str) -> Dict[str, Any]:
+    def detect_failure_behaviors(self, response: str, _precomputed: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Detect potential failure behaviors in the response.
         
         Returns:
             Dict with detected issues and confidence levels
         """
-        response_lower = response.lower()
+        pre = _precomputed or self._precompute(response)
+        return self._score_failures(
+            self._find_phrase_categories(pre['lower']),
+            len(_STATS_RE.findall(response)),
+            pre['word_count']
+        )
+    
+    @staticmethod
+    def _score_failures(phrase_categories: Set[str], stats_count: int, word_count: int) -> Dict[str, Any]:
+        """Build the failure-behavior result from the raw signals found in a response."""
         issues = []
         
         # Overconfidence indicators
-        overconfidence_phrases = [
-            "definitely", "certainly", "absolutely", "without a doubt",
-            "always", "never", "guaranteed"
-        ]
-        if any(phrase in response_lower for phrase in overconfidence_phrases):
+        if 'overconfidence' in phrase_categories:
             issues.append({
                 'type': 'Overconfidence',
                 'description': 'Response uses absolute language without hedging uncertainty',
@@ -132,17 +238,14 @@ class ResponseEvaluator:
             })
         
         # Potential hallucination indicators (mentions specific numbers without context)
-        import re
-        specific_stats = re.findall(r'\b\d{2,}\s*%\b|\b\$\d+(?:,\d+)*(?:\.\d+)?\s*(?:million|billion)?\b', response)
-        if len(specific_stats) > 3:
+        if stats_count > 3:
             issues.append({
                 'type': 'Potential Hallucination',
-                'description': f'Response contains {len(specific_stats)} specific statistics that may need verification',
+                'description': f'Response contains {stats_count} specific statistics that may need verification',
                 'severity': 'High'
             })
         
         # Over-elaboration check
-        word_count = len(response.split())
         if word_count > 600:
             issues.append({
                 'type': 'Over-elaboration',
@@ -151,8 +254,7 @@ class ResponseEvaluator:
             })
         
         # Missing hedging language
-        hedging_phrases = ["may", "might", "could", "typically", "often", "generally", "depending on"]
-        if not any(phrase in response_lower for phrase in hedging_phrases):
+        if 'hedging' not in phrase_categories:
             issues.append({
                 'type': 'Missing Uncertainty Language',
                 'description': 'Response lacks hedging language for uncertain claims',
@@ -177,10 +279,11 @@ class ResponseEvaluator:
         Returns:
             Complete evaluation dictionary
         """
-        accuracy = self.evaluate_accuracy(response)
-        completeness = self.evaluate_completeness(response)
-        efficiency = self.evaluate_token_efficiency(response, token_count)
-        failures = self.detect_failure_behaviors(response)
+        scan = self._scan(response)
+        accuracy = self._score_accuracy(*scan['accuracy_matches'])
+        completeness = self._score_completeness(*scan['completeness_matches'])
+        efficiency = self.evaluate_token_efficiency(response, token_count, _precomputed=scan)
+        failures = self._score_failures(scan['phrase_categories'], scan['stats_count'], scan['word_count'])
         
         return {
             'accuracy': accuracy,
@@ -197,7 +300,7 @@ class ResponseEvaluator:
         }
 
 
-def create_evaluation_summary(evaluations: Dict[str, Dict]) -> List[Dict]:
+def create_evaluation_summary(evaluations: Dict[str, Dict]) -> Dict[str, List]:
     """
     Create a summary table from multiple evaluations.
     
@@ -205,20 +308,79 @@ def create_evaluation_summary(evaluations: Dict[str, Dict]) -> List[Dict]:
         evaluations: Dict mapping variant_id to evaluation results
         
     Returns:
-        List of dicts suitable for DataFrame creation
+        Dict of column name to values, suitable for `pd.DataFrame(...)`
     """
-    rows = []
+    cols = {
+        'Variant': [],
+        'Accuracy (0-2)': [],
+        'Completeness (%)': [],
+        'Token Count': [],
+        'Issues Found': [],
+        'Clarity (1-5)': []
+    }
     for variant_id, eval_result in evaluations.items():
         summary = eval_result.get('summary', {})
-        rows.append({
-            'Variant': variant_id,
-            'Accuracy (0-2)': summary.get('accuracy_score', 'N/A'),
-            'Completeness (%)': summary.get('completeness_pct', 'N/A'),
-            'Token Count': summary.get('token_count', 'N/A'),
-            'Issues Found': summary.get('issue_count', 'N/A'),
-            'Clarity (1-5)': eval_result.get('clarity_score', 'TBD')
-        })
-    return rows
+        cols['Variant'].append(variant_id)
+        cols['Accuracy (0-2)'].append(summary.get('accuracy_score', 'N/A'))
+        cols['Completeness (%)'].append(summary.get('completeness_pct', 'N/A'))
+        cols['Token Count'].append(summary.get('token_count', 'N/A'))
+        cols['Issues Found'].append(summary.get('issue_count', 'N/A'))
+        cols['Clarity (1-5)'].append(eval_result.get('clarity_score', 'TBD'))
+    return cols
+
+
+def split_batched_response(response: str, batch_size: int) -> List[str]:
+    """
+    Split a batched response into per-query answers.
+    
+    Args:
+        response: Response to a prompt built with `PromptBuilder.build_batched_prompt`
+        batch_size: Number of queries in the batch
+        
+    Returns:
+        List of `batch_size` answers; queries the model skipped map to ''.
+        If a marker repeats, the first answer for that index is kept.
+    """
+    answers = [''] * batch_size
+    markers = list(_BATCH_MARKER_RE.finditer(response))
+    if not markers:
+        warnings.warn("No [#n] answer markers found in batched response")
+        return answers
+    
+    seen = set()
+    for marker, next_marker in zip(markers, markers[1:] + [None]):
+        index = int(marker.group(1)) - 1
+        if 0 <= index < batch_size and index not in seen:
+            seen.add(index)
+            end = next_marker.start() if next_marker else len(response)
+            answers[index] = response[marker.end():end].strip()
+    return answers
+
+
+def summarize_batch_usage(batch_prompt_tokens: int, unbatched_prompt_tokens: List[int]) -> Dict[str, Any]:
+    """
+    Compare the input-token cost of one batched request with sending each query alone.
+    
+    Args:
+        batch_prompt_tokens: 'prompt_token_count' reported for the batched request
+        unbatched_prompt_tokens: 'prompt_token_count' of each query's standalone prompt
+        
+    Returns:
+        Dict with 'batch_size', 'batch_prompt_tokens', 'unbatched_prompt_tokens',
+        'prompt_tokens_saved', 'savings_pct' and 'prompt_tokens_per_query'
+    """
+    batch_size = len(unbatched_prompt_tokens)
+    unbatched_total = sum(unbatched_prompt_tokens)
+    saved = unbatched_total - batch_prompt_tokens
+    
+    return {
+        'batch_size': batch_size,
+        'batch_prompt_tokens': batch_prompt_tokens,
+        'unbatched_prompt_tokens': unbatched_total,
+        'prompt_tokens_saved': saved,
+        'savings_pct': round(saved / unbatched_total * 100, 1) if unbatched_total > 0 else 0,
+        'prompt_tokens_per_query': round(batch_prompt_tokens / batch_size, 1) if batch_size > 0 else 0
+    }
 
 
 if __name__ == "__main__":
@@ -3,44 +3,87 @@ LLM Clients Module
 Provides unified interface for interacting with LLM APIs.
 """
 
+import hashlib
+import json
 import os
+import re
+import threading
 import time
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Union
 from pathlib import Path
-import yaml
+
+try:
+    from .config_utils import load_yaml
+except ImportError:
+    # Running the module directly as a script (python src/<module>.py)
+    from config_utils import load_yaml
+
+# KEY=value assignments, one per line; comment lines never match
+_ENV_RE = re.compile(r'(?m)^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t\r]*$')
+
 
 # Load .env file if it exists
 def load_env_file():
-    """Load environment variables from .env file."""
+    """Load environment variables from .env file. Variables already set take precedence."""
     env_path = Path(__file__).parent.parent / '.env'
     if env_path.exists():
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key.strip()] = value.strip()
+        for key, value in _ENV_RE.findall(env_path.read_text()):
+            os.environ.setdefault(key, value)
 
 load_env_file()
 
 # Google Gemini
 try:
     import google.generativeai as genai
+    from google.api_core import exceptions as google_exceptions
     GEMINI_AVAILABLE = True
+    # Rate-limit / transient errors worth retrying with backoff
+    _RETRYABLE_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.ServiceUnavailable)
 except ImportError:
     GEMINI_AVAILABLE = False
+    _RETRYABLE_ERRORS = ()
+
+# Default on-disk response cache, next to the .env file
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / '.llm_cache'
+
+# Optional: local token counting when the API omits usage metadata
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+_tiktoken_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens locally with tiktoken, or estimate from word count if unavailable."""
+    global _tiktoken_encoding
+    if TIKTOKEN_AVAILABLE:
+        if _tiktoken_encoding is None:
+            _tiktoken_encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_tiktoken_encoding.encode(text))
+    return int(len(text.split()) * 1.3)  # Rough estimate
 
 
 def load_config(config_path: str = "config/experiment_config.yaml") -> Dict[str, Any]:
     """Load experiment configuration from YAML file."""
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+    return load_yaml(config_path)
 
 
 class GeminiClient:
     """Wrapper for Google Gemini API."""
     
-    def __init__(self, model_name: str = "gemini-1.5-flash", **kwargs):
+    def __init__(self, model_name: str = "gemini-1.5-flash", cache_dir: Optional[Union[str, Path]] = DEFAULT_CACHE_DIR,
+                 max_retries: int = 3, **kwargs):
+        """
+        Args:
+            model_name: Gemini model identifier
+            cache_dir: Directory for cached responses; None disables caching
+            max_retries: Retries on rate-limit errors, with exponential backoff
+            **kwargs: Generation parameters passed to `genai.GenerationConfig`
+        """
         if not GEMINI_AVAILABLE:
             raise ImportError("google-generativeai package not installed")
         
@@ -51,37 +94,110 @@ class GeminiClient:
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel(model_name)
         self.model_name = model_name
+        self.generation_params = kwargs
         self.generation_config = genai.GenerationConfig(**kwargs)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_retries = max_retries
+    
+    def _cache_path(self, prompt: str) -> Path:
+        """Content-addressed cache file for a prompt under the current model settings."""
+        key = json.dumps({'m': self.model_name, 'cfg': self.generation_params, 'p': prompt}, sort_keys=True)
+        return self.cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
     
-    def generate(self, prompt: str) -> Dict[str, Any]:
+    def _generate_with_retry(self, prompt: str):
+        """Call the API, backing off exponentially (1s, 2s, 4s, ...) on rate limits."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.model.generate_content(
+                    prompt,
+                    generation_config=self.generation_config
+                )
+            except _RETRYABLE_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(2 ** attempt)
+    
+    def generate(self, prompt: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         Generate response from the model.
         
+        Identical prompts under the same model settings are served from the
+        on-disk cache with 'latency_ms' 0 and 'cached' True; the latency
+        measured when the response was first generated is kept in
+        'recorded_latency_ms'.
+        
         Returns:
-            Dict with 'response', 'token_count', 'latency_ms'
+            Dict with 'response', 'token_count', 'prompt_token_count', 'latency_ms', 'cached'
         """
+        cache_path = self._cache_path(prompt) if self.cache_dir and use_cache else None
+        if cache_path and cache_path.exists():
+            result = json.loads(cache_path.read_text())
+            return {**result, "latency_ms": 0, "recorded_latency_ms": result["latency_ms"], "cached": True}
+        
         start_time = time.time()
         
-        response = self.model.generate_content(
-            prompt,
-            generation_config=self.generation_config
-        )
+        response = self._generate_with_retry(prompt)
         
         latency_ms = (time.time() - start_time) * 1000
         
         # Extract response text and metadata
         response_text = response.text if response.text else ""
         
-        # Estimate token count (rough approximation)
-        token_count = len(response_text.split()) * 1.3  # Rough estimate
+        # Prefer the billed counts reported by the API
+        # (unreported counts read as 0 on the proto message, so treat falsy as missing)
+        usage = getattr(response, 'usage_metadata', None)
+        token_count = getattr(usage, 'candidates_token_count', None)
+        if not token_count:
+            token_count = count_tokens(response_text)
+        prompt_token_count = getattr(usage, 'prompt_token_count', None)
+        if not prompt_token_count:
+            prompt_token_count = count_tokens(prompt)
         
-        return {
+        result = {
             "response": response_text,
             "token_count": int(token_count),
+            "prompt_token_count": int(prompt_token_count),
             "latency_ms": round(latency_ms, 2),
             "model": self.model_name,
-            "finish_reason": "completed"
+            "finish_reason": "completed",
+            "cached": False
         }
+        
+        if cache_path:
+            # Write then rename so concurrent readers never see a partial file
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(json.dumps(result))
+            os.replace(tmp_path, cache_path)
+        
+        return result
+    
+    def _generate_safe(self, prompt: str, use_cache: bool = True) -> Dict[str, Any]:
+        """Generate a response, returning an error dict instead of raising."""
+        try:
+            return self.generate(prompt, use_cache=use_cache)
+        except Exception as e:
+            return {"error": str(e), "model": self.model_name}
+    
+    def generate_many(self, prompts: List[str], max_workers: int = 5,
+                      use_cache: bool = True) -> List[Dict[str, Any]]:
+        """
+        Generate responses for several prompts concurrently.
+        
+        API calls are network-bound, so they are dispatched from a thread pool.
+        A failing prompt yields a dict with an 'error' key rather than aborting
+        the whole batch. Pass use_cache=False to draw fresh samples, e.g. for
+        repeated trials.
+        
+        Returns:
+            List of result dicts in the same order as `prompts`
+        """
+        if not prompts:
+            return []
+        
+        workers = max(1, min(max_workers, len(prompts)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda p: self._generate_safe(p, use_cache=use_cache), prompts))
 
 
 class LLMClient:
@@ -99,17 +215,26 @@ class LLMClient:
                 model_name=model_name,
                 temperature=params.get('temperature', 0.7),
                 top_p=params.get('top_p', 0.95),
-                max_output_tokens=params.get('max_output_tokens', 1024)
+                max_output_tokens=params.get('max_output_tokens', 1024),
+                cache_dir=DEFAULT_CACHE_DIR if model_config.get('use_cache', True) else None,
+                max_retries=model_config.get('max_retries', 3)
             )
         else:
             raise ValueError(f"Unsupported provider: {provider}")
         
         self.provider = provider
         self.model_name = model_name
+        self.max_workers = model_config.get('max_workers', 5)
     
-    def generate(self, prompt: str) -> Dict[str, Any]:
+    def generate(self, prompt: str, use_cache: bool = True) -> Dict[str, Any]:
         """Generate response using the configured model."""
-        return self.client.generate(prompt)
+        return self.client.generate(prompt, use_cache=use_cache)
+    
+    def generate_many(self, prompts: List[str], max_workers: Optional[int] = None,
+                      use_cache: bool = True) -> List[Dict[str, Any]]:
+        """Generate responses for several prompts concurrently, preserving order."""
+        return self.client.generate_many(prompts, max_workers=max_workers or self.max_workers,
+                                         use_cache=use_cache)
     
     def get_model_info(self) -> Dict[str, str]:
         """Return model identification info."""
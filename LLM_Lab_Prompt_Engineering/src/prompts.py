@@ -3,22 +3,37 @@ Prompts Module
 Manages prompt variants and their construction.
 """
 
-from typing import Dict, Any, List
-import yaml
+import re
+from typing import Dict, Any, List, Optional
+
+try:
+    from .config_utils import load_yaml
+except ImportError:
+    # Running the module directly as a script (python src/<module>.py)
+    from config_utils import load_yaml
+
+# Accuracy on reasoning tasks degrades when more than ~8 queries share one request
+MAX_BATCH_SIZE = 8
+
+
+# Only the known placeholders; any other braces (e.g. JSON examples) are left as-is
+_PLACEHOLDER_RE = re.compile(r'\{(query|context)\}')
+
+
+def _render_template(template: str, query: str, context: str) -> str:
+    """Fill {query} and {context} in a single pass over the template."""
+    values = {'query': query, 'context': context}
+    return _PLACEHOLDER_RE.sub(lambda m: values[m.group(1)], template)
 
 
 def load_prompts(config_path: str = "config/experiment_config.yaml") -> Dict[str, Any]:
     """Load prompt configurations from YAML file."""
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
-    return config.get('prompts', {})
+    return load_yaml(config_path).get('prompts', {})
 
 
 def load_query_context(config_path: str = "config/experiment_config.yaml") -> Dict[str, str]:
     """Load the base query and context from config."""
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
-    return config.get('query', {})
+    return load_yaml(config_path).get('query', {})
 
 
 class PromptBuilder:
@@ -59,11 +74,53 @@ class PromptBuilder:
         query = self.query_context.get('base', '')
         context = self.query_context.get('context', '')
         
-        # Replace placeholders
-        prompt = template.replace('{query}', query)
-        prompt = prompt.replace('{context}', context)
+        return _render_template(template, query, context).strip()
+    
+    def build_batched_prompt(self, variant_ids: List[str], queries: Optional[List[str]] = None) -> str:
+        """
+        Build a single prompt that answers several variants in one request.
+        
+        Each variant's template is enumerated as [#1], [#2], ... so the
+        response can be split back apart with `split_batched_response` from
+        the evaluator module. If any batched template uses {context}, the
+        context is emitted once at the top and referenced from those items.
+        Note that every item in such a batch can then see the context, so
+        mix context-free variants into it only if that is acceptable.
+        Otherwise no context is added and each item asks the same question
+        as `build_prompt(variant_id)`.
+        
+        Args:
+            variant_ids: Prompt variant identifiers, one per batched query
+            queries: Optional per-variant queries; defaults to the base query
+            
+        Returns:
+            The batched prompt string
+        """
+        if not variant_ids:
+            raise ValueError("At least one variant is required")
+        if len(variant_ids) > MAX_BATCH_SIZE:
+            raise ValueError(f"Batch size {len(variant_ids)} exceeds maximum of {MAX_BATCH_SIZE}")
+        
+        base_query = self.query_context.get('base', '')
+        if queries is None:
+            queries = [base_query] * len(variant_ids)
+        elif len(queries) != len(variant_ids):
+            raise ValueError("queries must have the same length as variant_ids")
+        
+        uses_context = any('{context}' in self.prompts.get(v, {}).get('template', '') for v in variant_ids)
+        context = self.query_context.get('context', '') if uses_context else ''
+        items = []
+        for i, (variant_id, query) in enumerate(zip(variant_ids, queries), start=1):
+            if variant_id not in self.prompts:
+                raise ValueError(f"Unknown variant: {variant_id}")
+            template = self.prompts[variant_id]['template']
+            # Context is shared once at the top rather than repeated per query
+            item = _render_template(template, query, '(see shared context above)')
+            items.append(f"[#{i}] {item.strip()}")
         
-        return prompt.strip()
+        header = "Answer each query independently, prefixed by [#i]:"
+        batched = f"{header}\n" + "\n".join(items)
+        return f"{context.strip()}\n\n{batched}" if context.strip() else batched
     
     def build_all_prompts(self) -> Dict[str, Dict[str, str]]:
         """
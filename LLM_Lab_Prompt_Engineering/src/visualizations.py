@@ -7,7 +7,8 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional
 
 
 def setup_style():
@@ -16,66 +17,75 @@ def setup_style():
     sns.set_palette("husl")
 
 
-def plot_accuracy_comparison(evaluations: Dict[str, Dict], save_path: str = None):
+def _bar_plot(ax, variants: List[str], values: List[Any], colors, ylabel: str, title: str,
+              ylim: float, label_offset: float, fmt: str = '{}'):
+    """Draw a labelled per-variant bar chart on an existing Axes."""
+    bars = ax.bar(variants, values, color=colors)
+    
+    ax.set_xlabel('Prompt Variant', fontsize=12)
+    ax.set_ylabel(ylabel, fontsize=12)
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.set_ylim(0, ylim)
+    
+    # Add value labels on bars
+    for bar, value in zip(bars, values):
+        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + label_offset,
+                fmt.format(value), ha='center', va='bottom', fontsize=11)
+    
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+
+
+def _bar_axes(ax=None):
+    """Return (fig, ax) for a bar chart, clearing `ax` for reuse if one is given."""
+    if ax is None:
+        return plt.subplots(figsize=(10, 6))
+    ax.clear()
+    return ax.figure, ax
+
+
+def plot_accuracy_comparison(evaluations: Dict[str, Dict], save_path: str = None, ax=None):
     """
     Create bar chart comparing accuracy scores across variants.
     
     Args:
         evaluations: Dict mapping variant_id to evaluation results
         save_path: Optional path to save the figure
+        ax: Optional Axes to draw on (cleared first) instead of a new figure
     """
     setup_style()
     
     variants = list(evaluations.keys())
     scores = [evaluations[v]['summary']['accuracy_score'] for v in variants]
     
-    fig, ax = plt.subplots(figsize=(10, 6))
-    bars = ax.bar(variants, scores, color=sns.color_palette("husl", len(variants)))
-    
-    ax.set_xlabel('Prompt Variant', fontsize=12)
-    ax.set_ylabel('Accuracy Score (0-2)', fontsize=12)
-    ax.set_title('Accuracy Score Comparison Across Prompt Variants', fontsize=14, fontweight='bold')
-    ax.set_ylim(0, 2.5)
-    
-    # Add value labels on bars
-    for bar, score in zip(bars, scores):
-        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.05,
-                str(score), ha='center', va='bottom', fontsize=11)
-    
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
+    fig, ax = _bar_axes(ax)
+    _bar_plot(ax, variants, scores, sns.color_palette("husl", len(variants)),
+              ylabel='Accuracy Score (0-2)',
+              title='Accuracy Score Comparison Across Prompt Variants',
+              ylim=2.5, label_offset=0.05)
+    fig.tight_layout()
     
     if save_path:
-        plt.savefig(save_path, dpi=150, bbox_inches='tight')
+        fig.savefig(save_path, dpi=150, bbox_inches='tight')
     
     return fig
 
 
-def plot_completeness_comparison(evaluations: Dict[str, Dict], save_path: str = None):
+def plot_completeness_comparison(evaluations: Dict[str, Dict], save_path: str = None, ax=None):
     """Create bar chart for completeness percentages."""
     setup_style()
     
     variants = list(evaluations.keys())
     percentages = [evaluations[v]['summary']['completeness_pct'] for v in variants]
     
-    fig, ax = plt.subplots(figsize=(10, 6))
-    bars = ax.bar(variants, percentages, color=sns.color_palette("coolwarm", len(variants)))
-    
-    ax.set_xlabel('Prompt Variant', fontsize=12)
-    ax.set_ylabel('Completeness (%)', fontsize=12)
-    ax.set_title('Checklist Completeness Across Prompt Variants', fontsize=14, fontweight='bold')
-    ax.set_ylim(0, 110)
-    
-    # Add value labels
-    for bar, pct in zip(bars, percentages):
-        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 2,
-                f'{pct}%', ha='center', va='bottom', fontsize=11)
-    
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
+    fig, ax = _bar_axes(ax)
+    _bar_plot(ax, variants, percentages, sns.color_palette("coolwarm", len(variants)),
+              ylabel='Completeness (%)',
+              title='Checklist Completeness Across Prompt Variants',
+              ylim=110, label_offset=2, fmt='{}%')
+    fig.tight_layout()
     
     if save_path:
-        plt.savefig(save_path, dpi=150, bbox_inches='tight')
+        fig.savefig(save_path, dpi=150, bbox_inches='tight')
     
     return fig
 
@@ -124,21 +134,23 @@ def plot_radar_chart(evaluations: Dict[str, Dict], save_path: str = None):
     # Prepare normalized metrics (0-1 scale)
     metrics = ['Accuracy', 'Completeness', 'Efficiency', 'Safety']
     
-    data = []
-    for v in variants:
-        summary = evaluations[v]['summary']
-        accuracy_norm = summary['accuracy_score'] / 2  # 0-2 -> 0-1
-        completeness_norm = summary['completeness_pct'] / 100  # 0-100 -> 0-1
-        
-        # Efficiency: lower tokens = higher efficiency (normalized inverse)
-        max_tokens = max(evaluations[vv]['summary']['token_count'] for vv in variants)
-        efficiency_norm = 1 - (summary['token_count'] / max_tokens) if max_tokens > 0 else 0.5
-        
-        # Safety: fewer issues = higher safety
-        max_issues = max(evaluations[vv]['summary']['issue_count'] for vv in variants)
-        safety_norm = 1 - (summary['issue_count'] / (max_issues + 1))
-        
-        data.append([accuracy_norm, completeness_norm, efficiency_norm, safety_norm])
+    # One row per variant: accuracy, completeness, token count, issue count
+    raw = np.array([
+        [s['accuracy_score'], s['completeness_pct'], s['token_count'], s['issue_count']]
+        for s in (evaluations[v]['summary'] for v in variants)
+    ], dtype=float).reshape(-1, 4)
+    
+    data = np.empty_like(raw)
+    data[:, 0] = raw[:, 0] / 2  # 0-2 -> 0-1
+    data[:, 1] = raw[:, 1] / 100  # 0-100 -> 0-1
+    
+    # Efficiency: lower tokens = higher efficiency (normalized inverse)
+    max_tokens = raw[:, 2].max(initial=0)
+    data[:, 2] = 1 - raw[:, 2] / max_tokens if max_tokens > 0 else 0.5
+    
+    # Safety: fewer issues = higher safety
+    max_issues = raw[:, 3].max(initial=0)
+    data[:, 3] = 1 - raw[:, 3] / (max_issues + 1)
     
     # Create radar chart
     angles = np.linspace(0, 2 * np.pi, len(metrics), endpoint=False).tolist()
@@ -148,7 +160,8 @@ def plot_radar_chart(evaluations: Dict[str, Dict], save_path: str = None):
     
     colors = sns.color_palette("husl", len(variants))
     
-    for i, (variant, values) in enumerate(zip(variants, data)):
+    for i, (variant, row) in enumerate(zip(variants, data)):
+        values = row.tolist()
         values += values[:1]  # Complete the circle
         ax.plot(angles, values, 'o-', linewidth=2, label=variant, color=colors[i])
         ax.fill(angles, values, alpha=0.1, color=colors[i])
@@ -171,30 +184,24 @@ def plot_issues_heatmap(evaluations: Dict[str, Dict], save_path: str = None):
     """Create heatmap showing issue types across variants."""
     setup_style()
     
-    # Collect all issue types
-    all_issue_types = set()
-    for v, eval_result in evaluations.items():
-        for issue in eval_result.get('failure_behaviors', {}).get('issues', []):
-            all_issue_types.add(issue['type'])
+    # Collect (variant, issue type) pairs
+    pairs = pd.DataFrame(
+        [(v, issue['type'])
+         for v, eval_result in evaluations.items()
+         for issue in eval_result.get('failure_behaviors', {}).get('issues', [])],
+        columns=['variant', 'issue_type']
+    )
     
-    if not all_issue_types:
+    if pairs.empty:
         print("No issues detected across variants.")
         return None
     
-    all_issue_types = sorted(list(all_issue_types))
-    variants = list(evaluations.keys())
-    
-    # Create matrix
-    matrix = []
-    for v in variants:
-        row = []
-        issues = evaluations[v].get('failure_behaviors', {}).get('issues', [])
-        issue_types_in_v = [i['type'] for i in issues]
-        for issue_type in all_issue_types:
-            row.append(1 if issue_type in issue_types_in_v else 0)
-        matrix.append(row)
-    
-    df = pd.DataFrame(matrix, index=variants, columns=all_issue_types)
+    # Presence matrix; variants without issues still get a row
+    df = (pd.crosstab(pairs['variant'], pairs['issue_type'])
+          .clip(upper=1)
+          .reindex(list(evaluations.keys()), fill_value=0))
+    df.index.name = None
+    df.columns.name = None
     
     fig, ax = plt.subplots(figsize=(12, 6))
     sns.heatmap(df, annot=True, cmap='RdYlGn_r', cbar_kws={'label': 'Issue Present'},
@@ -213,18 +220,74 @@ def plot_issues_heatmap(evaluations: Dict[str, Dict], save_path: str = None):
     return fig
 
 
-def generate_all_visualizations(evaluations: Dict[str, Dict], output_dir: str = "results"):
-    """Generate all visualization plots and save to output directory."""
+# Plot name -> (plotting function, output file name)
+_ALL_PLOTS = {
+    'accuracy': (plot_accuracy_comparison, 'accuracy_comparison.png'),
+    'completeness': (plot_completeness_comparison, 'completeness_comparison.png'),
+    'efficiency': (plot_token_efficiency, 'token_efficiency.png'),
+    'radar': (plot_radar_chart, 'radar_comparison.png'),
+    'issues': (plot_issues_heatmap, 'issues_heatmap.png'),
+}
+
+
+# Plots with the same layout, rendered on one reused figure in parallel mode
+_SHARED_FIGURE_PLOTS = ('accuracy', 'completeness')
+
+
+def _render_group(args: tuple) -> Dict[str, Optional[str]]:
+    """Render and save a group of plots in a worker process; returns their saved paths."""
+    names, evaluations, output_dir = args
+    # Workers only write files, so use the non-interactive backend
+    plt.switch_backend('Agg')
+    
+    ax = None
+    if len(names) > 1:
+        setup_style()
+        _, ax = plt.subplots(figsize=(10, 6))
+    
+    paths = {}
+    for name in names:
+        plot_fn, filename = _ALL_PLOTS[name]
+        save_path = f"{output_dir}/{filename}"
+        fig = plot_fn(evaluations, save_path, ax=ax) if ax is not None else plot_fn(evaluations, save_path)
+        paths[name] = save_path if fig is not None else None
+    
+    plt.close('all')
+    return paths
+
+
+def generate_all_visualizations(evaluations: Dict[str, Dict], output_dir: str = "results",
+                                parallel: bool = False):
+    """
+    Generate all visualization plots and save to output directory.
+    
+    Args:
+        evaluations: Dict mapping variant_id to evaluation results
+        output_dir: Directory to write the PNG files to
+        parallel: Render the plots in separate processes. Process start-up
+            outweighs the gain for a handful of variants, so this only pays
+            off for large reports; figures are not returned for display.
+            
+    Returns:
+        Dict mapping plot name to its Figure, or to the saved path if parallel
+    """
     import os
     os.makedirs(output_dir, exist_ok=True)
     
-    figs = {}
+    if parallel:
+        groups = [_SHARED_FIGURE_PLOTS] + [(name,) for name in _ALL_PLOTS if name not in _SHARED_FIGURE_PLOTS]
+        tasks = [(names, evaluations, output_dir) for names in groups]
+        paths = {}
+        with ProcessPoolExecutor(max_workers=len(tasks)) as executor:
+            for group_paths in executor.map(_render_group, tasks):
+                paths.update(group_paths)
+        paths = {name: paths[name] for name in _ALL_PLOTS}
+        print(f"All visualizations saved to {output_dir}/")
+        return paths
     
-    figs['accuracy'] = plot_accuracy_comparison(evaluations, f"{output_dir}/accuracy_comparison.png")
-    figs['completeness'] = plot_completeness_comparison(evaluations, f"{output_dir}/completeness_comparison.png")
-    figs['efficiency'] = plot_token_efficiency(evaluations, f"{output_dir}/token_efficiency.png")
-    figs['radar'] = plot_radar_chart(evaluations, f"{output_dir}/radar_comparison.png")
-    figs['issues'] = plot_issues_heatmap(evaluations, f"{output_dir}/issues_heatmap.png")
+    figs = {}
+    for name, (plot_fn, filename) in _ALL_PLOTS.items():
+        figs[name] = plot_fn(evaluations, f"{output_dir}/{filename}")
     
     print(f"All visualizations saved to {output_dir}/")
     return figs